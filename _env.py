@@ -0,0 +1,22 @@
+"""
+Shared environment loader for the standalone test scripts
+Parses .env once and exposes the values the scripts need
+"""
+
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=1)
+def load_env() -> dict:
+    """Load .env once and return the script settings"""
+    load_dotenv()
+    return {
+        "MONGODB_URI": os.environ.get("MONGODB_URI", ""),
+        "MONGODB_DATABASE": os.environ.get("MONGODB_DATABASE", "leadgen"),
+        "FIRECRAWL_BASE_URL": os.environ.get("FIRECRAWL_BASE_URL", ""),
+    }
+
+
+ENV = load_env()
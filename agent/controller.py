@@ -5,7 +5,7 @@ ReAct Research Controller - orchestrates all tools to generate leads
 
 import json
 import logging
-from typing import List
+from typing import List, Optional
 from agent.react_agent import ReActAgent
 from agent.tools.llm_helpers import extract_icp, generate_search_queries, score_company
 from agent.tools.searxng_tool import searxng_search
@@ -100,7 +100,8 @@ class LeadResearchController:
         max_iterations: int = 5,
         cancellation_callback = None,
         product_id: str = "default",  # NEW
-        product_name: str = None  # NEW
+        product_name: str = None,  # NEW
+        on_lead_found = None
     ):
         self.product_description = product_description
         self.target_count = target_count  
@@ -116,8 +117,9 @@ class LeadResearchController:
             base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
         )
         self.step_callback = None  # For real-time progress streaming
+        self.on_lead_found = on_lead_found  # Called with each lead as soon as it is saved
         
-        logger.info(f"Initialized controller: target={target_count}, max_iterations={max_iterations}, product_id={product_id}")
+        logger.info("Initialized controller: target=%d, max_iterations=%d, product_id=%s", target_count, max_iterations, product_id)
         
         # Update system prompt to include product context
         system_prompt = CONTROLLER_PROMPT.format(
@@ -141,12 +143,31 @@ class LeadResearchController:
         """Set callback for real-time step updates (for UI streaming)"""
         self.step_callback = callback
     
+    def set_lead_callback(self, callback):
+        """Set callback invoked with each lead as soon as it is saved (for UI streaming)"""
+        self.on_lead_found = callback
+    
+    @staticmethod
+    def _saved_lead_from_observation(observation: str, tool_input: dict) -> Optional[dict]:
+        """Build the lead payload from a successful save_lead_tool observation"""
+        try:
+            result = json.loads(observation)
+        except (json.JSONDecodeError, TypeError):
+            return None
+        
+        if not isinstance(result, dict) or result.get('status') != 'success':
+            return None
+        
+        lead = dict(tool_input or {})
+        lead['lead_id'] = result.get('lead_id')
+        return lead
+    
     def run(self) -> List[CompanyLead]:
         """
         Execute lead research loop.
         Returns list of discovered quality leads.
         """
-        logger.info(f"🚀 Starting lead research: target={self.target_count}, max_iter={self.max_iterations}")
+        logger.info("🚀 Starting lead research: target=%d, max_iter=%d", self.target_count, self.max_iterations)
         
         # Initial prompt for controller
         initial_prompt = f"""Find {self.target_count} quality leads (score >= 50) for this product.
@@ -167,6 +188,7 @@ Start now by extracting the ICP!"""
         logger.info("💭 ReAct controller starting...")
         
         saved_count = 0
+        last_action_input = {}
         max_steps = self.max_iterations * 15
         
         for step_num, step in enumerate(self.agent.run_streaming(
@@ -181,22 +203,30 @@ Start now by extracting the ICP!"""
                 
             # Log step
             if step.step_type == "thought":
-                logger.info(f"💭 Thought: {step.content[:150]}...")
+                logger.info("💭 Thought: %.150s...", step.content)
             elif step.step_type == "action":
-                logger.info(f"⚙️ Action: {step.tool_name}")
+                logger.info("⚙️ Action: %s", step.tool_name)
+                last_action_input = step.tool_input or {}
                 
                 # Check if agent called complete_task - end gracefully
                 if step.tool_name == "complete_task":
                     logger.info("🏁 Agent called complete_task - ending gracefully")
                     
             elif step.step_type == "observation":
-                obs_preview = step.content[:200] if len(step.content) > 200 else step.content
-                logger.info(f"📊 Observation: {obs_preview}...")
+                logger.info("📊 Observation: %.200s...", step.content)
                 
                 # Track saved leads from observations
-                if '"status": "saved"' in step.content or 'Saved lead successfully' in step.content:
+                saved_lead = None
+                if step.tool_name == "save_lead_tool":
+                    saved_lead = self._saved_lead_from_observation(step.content, last_action_input)
+                
+                if saved_lead or '"status": "saved"' in step.content or 'Saved lead successfully' in step.content:
                     saved_count += 1
-                    logger.info(f"✅ Lead count: {saved_count}/{self.target_count}")
+                    logger.info("✅ Lead count: %d/%d", saved_count, self.target_count)
+                
+                # Stream the lead immediately instead of waiting for the run to finish
+                if saved_lead and self.on_lead_found:
+                    self.on_lead_found(saved_lead)
                     
                 # Check if complete_task was called
                 if '"task_completed": true' in step.content:
@@ -206,7 +236,7 @@ Start now by extracting the ICP!"""
                     break
                     
             elif step.step_type == "final_answer":
-                logger.info(f"✅ Final Answer: {step.content[:200]}...")
+                logger.info("✅ Final Answer: %.200s...", step.content)
             
             # Callback for UI streaming
             if self.step_callback:
@@ -221,7 +251,7 @@ Start now by extracting the ICP!"""
             if lead.get('relevance_score', 0) >= 50
         ]
         
-        logger.info(f"✅ Research complete: {saved_count} quality leads saved")
+        logger.info("✅ Research complete: %d quality leads saved", saved_count)
         return quality_leads
 
 
@@ -254,5 +284,5 @@ def save_scored_lead(company_data_json: str, score_data_json: str, source_urls:
         return add_lead(lead, product_description)
     
     except Exception as e:
-        logger.error(f"Failed to save lead: {e}")
+        logger.error("Failed to save lead: %s", e)
         return False
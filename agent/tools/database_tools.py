@@ -12,7 +12,7 @@ from langchain_core.tools import tool
 from db.mongodb import get_db_manager
 from db.models import (
     Product, Lead, EmailDetail, LeadQualification,
-    product_to_dict, lead_to_dict, dict_to_product, dict_to_lead
+    product_to_dict, lead_to_dict, dict_to_product, dict_to_lead, created_at_iso
 )
 
 # Import POC enhancement tools
@@ -78,6 +78,7 @@ def save_lead_tool(
             }
         
         # Build lead document
+        now = datetime.utcnow()
         lead_doc = {
             'domain': domain,
             'name': name,
@@ -87,8 +88,9 @@ def save_lead_tool(
             'email_source': email_source,
             'product_id': product_id,  # CRITICAL: Save product association
             'product_name': product_name,  # Save product name for easier filtering
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow()
+            'created_at': now,
+            'created_at_iso': created_at_iso(now),
+            'updated_at': now
         }
         
         # Add email validation details if provided (from enrichment)
@@ -109,6 +111,13 @@ def save_lead_tool(
         
         # Insert lead
         result = leads_collection.insert_one(lead_doc)
+        
+        # Keep the product's cached lead count in sync
+        if ObjectId.is_valid(product_id):
+            db.products.update_one(
+                {'_id': ObjectId(product_id)},
+                {'$inc': {'lead_count': 1}}
+            )
         client.close()
         
         logger.info(f"✅ Saved lead: {name} (domain: {domain}, score: {qualification.get('score') if qualification else 'N/A'})")
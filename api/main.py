@@ -3,18 +3,27 @@ main.py
 FastAPI backend for Lead Generator AI Agent
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Query
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse, ORJSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, Field, ConfigDict
+from typing import List, Optional, Literal
 import sys
 from pathlib import Path
 import logging
-import json
+import re
+import operator
+import hashlib
 import asyncio
-from queue import Queue
+import threading
+import anyio
+import anyio.to_thread
+import orjson
+from queue import Queue, Empty
 import os
+from datetime import datetime, timezone
+from bson import ObjectId
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -22,8 +31,9 @@ from agent.controller import LeadResearchController
 from agent.state import CompanyLead, load_leads, clear_all_leads
 
 # MongoDB imports
+from config.settings import get_settings
 from db.mongodb import get_db_manager
-from db.models import Product, Lead, dict_to_product, dict_to_lead
+from db.models import Product, Lead, dict_to_product, dict_to_lead, created_at_iso
 from agent.tools.database_tools import create_product_tool
 
 logging.basicConfig(
@@ -32,6 +42,63 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Pre-encoded Server-Sent Events framing for the streaming endpoint
+DATA_PREFIX = b"data: "
+STEP_PREFIX = b"event: step\ndata: "
+OBSERVATION_PREFIX = b"event: observation\ndata: "
+LEAD_PREFIX = b"event: lead\ndata: "
+COMPLETE_PREFIX = b"event: complete\ndata: "
+ERROR_PREFIX = b"event: error\ndata: "
+SUFFIX = b"\n\n"
+
+# 24 hex chars - fast-reject malformed MongoDB ObjectIds before parsing
+_OID_RE = re.compile(r'\A[0-9a-fA-F]{24}\Z')  # \Z: '$' would also accept a trailing newline
+
+# Fields returned by /api/leads/filter (everything else stays on the server)
+# Every key is always present (null/[] when missing) so rows can be unpacked
+# positionally; leads written before created_at_iso existed get it formatted
+# server-side in the same format as db.models.created_at_iso().
+FILTER_LEADS_PROJECTION = {
+    '_id': 1,
+    'product_id': {'$ifNull': ['$product_id', None]},
+    'domain': {'$ifNull': ['$domain', None]},
+    'name': {'$ifNull': ['$name', None]},
+    'description': {'$ifNull': ['$description', None]},
+    'url': {'$ifNull': ['$url', None]},
+    'emails': {'$ifNull': ['$emails', []]},
+    'qualification': {'$ifNull': ['$qualification', None]},
+    'created_at_iso': {'$ifNull': [
+        '$created_at_iso',
+        {'$dateToString': {'date': '$created_at', 'format': '%Y-%m-%dT%H:%M:%S.%L000'}}
+    ]}
+}
+# Largest page /api/leads/filter returns in a single request
+FILTER_LEADS_MAX_LIMIT = 1000
+
+FILTER_LEAD_FIELDS = operator.itemgetter(
+    '_id', 'product_id', 'domain', 'name', 'description',
+    'url', 'emails', 'qualification', 'created_at_iso'
+)
+FILTER_LEAD_KEYS = (
+    'id', 'product_id', 'domain', 'name', 'description',
+    'url', 'emails', 'qualification', 'created_at'
+)
+
+def _orjson_default(obj):
+    """orjson fallback for BSON types left in response content"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError
+
+
+class MongoJSONResponse(ORJSONResponse):
+    """ORJSONResponse that serializes raw ObjectIds without per-field str() casts"""
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_orjson_default)
+
+# Seconds between background corrections of cached products.lead_count
+LEAD_COUNT_RECONCILE_INTERVAL = 3600
+
 # Global cancellation tracking for stop button
 cancellation_flag = {"cancelled": False}
 active_generation_id = None
@@ -68,6 +135,28 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+class SelectiveGZipMiddleware:
+    """GZip responses except excluded paths (gzip buffering breaks SSE streams)"""
+    
+    def __init__(self, app, minimum_size: int = 1024, exclude_paths: tuple = ()):
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, minimum_size=minimum_size)
+        self.exclude_paths = tuple(exclude_paths)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith(self.exclude_paths):
+            await self.gzip_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+# Compress JSON list responses, but never the SSE stream
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=1024,
+    exclude_paths=("/api/generate/stream",)
+)
+
 # Serve static files (UI)
 static_dir = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
@@ -76,17 +165,36 @@ app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 @app.on_event("startup")
 async def startup_event():
     """Auto-configure MongoDB on startup if .env has credentials"""
+    # Bound the number of controller runs offloaded to worker threads
+    app.state.gen_limiter = anyio.CapacityLimiter(get_settings().MAX_CONCURRENT_GENERATIONS)
+    
     mongo_uri = os.getenv("MONGODB_URI")
     mongo_db = os.getenv("MONGODB_DATABASE")
     
     if mongo_uri and mongo_db:
         try:
-            await get_db_manager().configure(mongo_uri, mongo_db)
-            logger.info(f"✅ MongoDB auto-configured: {mongo_db}")
+            manager = get_db_manager()
+            await manager.configure(mongo_uri, mongo_db)
+            logger.info("✅ MongoDB auto-configured: %s", mongo_db)
+            
+            # Link legacy leads (matched only by product_name) to their product_id
+            await manager.backfill_lead_product_ids()
+            await manager.reconcile_lead_counts()
         except Exception as e:
-            logger.warning(f"⚠️ MongoDB auto-config failed: {e}")
+            logger.warning("⚠️ MongoDB auto-config failed: %s", e)
     else:
         logger.info("ℹ️ MongoDB not in .env, configure via /api/config/mongodb")
+    
+    app.state.reconcile_task = asyncio.create_task(_reconcile_lead_counts_periodically())
+
+
+async def _reconcile_lead_counts_periodically():
+    """Correct drift in cached products.lead_count once per interval"""
+    while True:
+        await asyncio.sleep(LEAD_COUNT_RECONCILE_INTERVAL)
+        manager = get_db_manager()
+        if manager.is_configured():
+            await manager.reconcile_lead_counts()
 
 
 # Root route - serve the UI
@@ -99,6 +207,8 @@ async def read_root():
     return HTMLResponse(content="<h1>Lead Generation Agent API</h1><p>Visit <a href='/docs'>/docs</a> for API documentation</p>", status_code=200)
 
 # Request/Response models
+CompanySize = Literal["startup", "SMB", "mid-market", "enterprise"]
+
 class LeadGenRequest(BaseModel):
     product_description: str = Field(..., min_length=20, description="Product/service description")
     
@@ -110,7 +220,7 @@ class LeadGenRequest(BaseModel):
     # Optional additional fields for better targeting
     target_industries: Optional[str] = Field(default=None, description="Target industries (comma-separated)")
     target_regions: Optional[str] = Field(default=None, description="Target geographic regions (comma-separated)")
-    company_size: Optional[str] = Field(default=None, description="Preferred company size (startup/SMB/mid-market/enterprise)")
+    company_size: Optional[CompanySize] = Field(default=None, description="Preferred company size (startup/SMB/mid-market/enterprise)")
     budget_range: Optional[str] = Field(default=None, description="Typical budget range")
     target_personas: Optional[List[str]] = Field(default=None, description="Target decision maker personas")
     
@@ -122,9 +232,10 @@ class LeadGenRequest(BaseModel):
     target_count: int = Field(default=30, ge=5, le=100, description="Target number of quality leads")
     max_iterations: int = Field(default=5, ge=1, le=10, description="Max search iterations")
     
-    class Config:
-        # Allow empty strings to be converted to None
-        json_schema_extra = {
+    model_config = ConfigDict(
+        # Strip surrounding whitespace from all string fields
+        str_strip_whitespace=True,
+        json_schema_extra={
             "example": {
                 "product_description": "Cloud monitoring platform for DevOps teams",
                 "target_industries": "Technology, E-commerce",
@@ -137,6 +248,7 @@ class LeadGenRequest(BaseModel):
                 "max_iterations": 5
             }
         }
+    )
 
 class LeadGenResponse(BaseModel):
     leads: List[CompanyLead]
@@ -165,6 +277,26 @@ class ProductResponse(BaseModel):
     created_at: str
     metadata: dict
 
+def get_leads_collection():
+    """Dependency: leads collection, 503 when MongoDB is not configured"""
+    manager = get_db_manager()
+    if not manager.is_configured():
+        raise HTTPException(status_code=503, detail="MongoDB not configured")
+    return manager.leads
+
+def get_products_collection():
+    """Dependency: products collection, 503 when MongoDB is not configured"""
+    manager = get_db_manager()
+    if not manager.is_configured():
+        raise HTTPException(status_code=503, detail="MongoDB not configured")
+    return manager.products
+
+def product_object_id(product_id: str) -> ObjectId:
+    """Dependency: parse the product_id path parameter, 400 on malformed IDs"""
+    if not _OID_RE.match(product_id):
+        raise HTTPException(status_code=400, detail="Invalid product_id")
+    return ObjectId(product_id)
+
 @app.get("/", response_class=HTMLResponse)
 async def root():
     """Serve main UI"""
@@ -188,7 +320,7 @@ async def generate_leads(request: LeadGenRequest):
     7. Repeats until target reached or max iterations hit
     """
     try:
-        logger.info(f"🚀 Lead generation request: target={request.target_count}, product='{request.product_description[:50]}...'")
+        logger.info("🚀 Lead generation request: target=%d, product='%.50s...'", request.target_count, request.product_description)
         
         # Create and run controller
         controller = LeadResearchController(
@@ -202,7 +334,7 @@ async def generate_leads(request: LeadGenRequest):
         # Count quality leads
         quality_leads = [lead for lead in leads if lead.get('relevance_score', 0) >= 50]
         
-        logger.info(f"✅ Generation complete: {len(quality_leads)} quality leads (total: {len(leads)})")
+        logger.info("✅ Generation complete: %d quality leads (total: %d)", len(quality_leads), len(leads))
         
         return LeadGenResponse(
             leads=leads,
@@ -216,6 +348,48 @@ async def generate_leads(request: LeadGenRequest):
         logger.exception("Lead generation failed")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _lead_cache_key(
+    product_description: str,
+    target_count: int,
+    max_iterations: int,
+    product_id: Optional[str] = None,
+    product_name: Optional[str] = None
+) -> str:
+    """Cache key for a lead-generation request (description is case/whitespace-insensitive)"""
+    normalized = " ".join(product_description.lower().split())
+    # Unit separator between parts so adjacent values cannot run together
+    parts = (normalized, str(target_count), str(max_iterations), product_id or "", product_name or "")
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+async def _get_cached_leads(cache_key: str) -> Optional[List[dict]]:
+    """Return cached leads for a request key, or None on miss / MongoDB unavailable"""
+    manager = get_db_manager()
+    if not manager.is_configured():
+        return None
+    try:
+        cache_doc = await manager.get_database().lead_gen_cache.find_one({'_id': cache_key})
+    except Exception as e:
+        logger.warning("Lead cache lookup failed: %s", e)
+        return None
+    return cache_doc['leads'] if cache_doc else None
+
+
+async def _cache_leads(cache_key: str, leads: List[dict]):
+    """Write-through generated leads to the cache (expired by TTL index)"""
+    manager = get_db_manager()
+    if not leads or not manager.is_configured():
+        return
+    try:
+        await manager.get_database().lead_gen_cache.replace_one(
+            {'_id': cache_key},
+            {'_id': cache_key, 'leads': leads, 'created_at': datetime.now(timezone.utc)},
+            upsert=True
+        )
+    except Exception as e:
+        logger.warning("Lead cache write failed: %s", e)
+
+
 @app.get("/api/generate/stream")
 async def generate_leads_stream(
     product_description: str,
@@ -228,11 +402,14 @@ async def generate_leads_stream(
     seller_company: str = None,
     seller_value_prop: str = None,
     product_id: str = None,  # NEW
-    product_name: str = None  # NEW
+    product_name: str = None,  # NEW
+    force_refresh: bool = False
 ):
     """
     Stream lead generation progress in real-time using Server-Sent Events (SSE).
     Sends each agent step (thought, action, observation) as it happens.
+    Identical requests within the cache TTL replay the cached leads unless
+    force_refresh is set.
     """
     async def event_generator():
         try:
@@ -261,7 +438,18 @@ async def generate_leads_stream(
                 enriched_description += f"\nValue Proposition: {seller_value_prop}"
             
             # Send start event
-            yield f"data: {json.dumps({'type': 'start', 'message': 'Starting lead research...'})}\n\n"
+            yield DATA_PREFIX + orjson.dumps({'type': 'start', 'message': 'Starting lead research...'}) + SUFFIX
+            
+            # Replay cached leads for an identical recent request
+            cache_key = _lead_cache_key(enriched_description, target_count, max_iterations, product_id, product_name)
+            if not force_refresh:
+                cached_leads = await _get_cached_leads(cache_key)
+                if cached_leads is not None:
+                    logger.info("♻️ Lead cache hit: %d leads", len(cached_leads))
+                    for lead in cached_leads:
+                        yield LEAD_PREFIX + orjson.dumps(lead) + SUFFIX
+                    yield COMPLETE_PREFIX + orjson.dumps({'total_leads': len(cached_leads), 'cached': True}) + SUFFIX
+                    return
             
             # Reset cancellation flag
             global cancellation_flag, active_generation_id
@@ -269,9 +457,13 @@ async def generate_leads_stream(
             active_generation_id = str(uuid.uuid4())
             cancellation_flag = {"cancelled": False}
             
+            # Set when the SSE client goes away while the controller is running
+            client_gone = threading.Event()
+            controller_started = threading.Event()
+            
             # Create cancellation callback
             def check_cancellation():
-                return cancellation_flag.get("cancelled", False)
+                return client_gone.is_set() or cancellation_flag.get("cancelled", False)
             
             # Create controller
             controller = LeadResearchController(
@@ -283,37 +475,13 @@ async def generate_leads_stream(
                 product_name=product_name
             )
             
-            # Set up step callback to stream progress
-            step_count = 0
-            
-            def step_callback(step):
-                nonlocal step_count
-                step_count += 1
-                
-                event_data = {
-                    'type': step.step_type,
-                    'step_number': step_count,
-                    'content': step.content,
-                    'timestamp': step.timestamp if hasattr(step, 'timestamp') else None
-                }
-                
-                if step.step_type == "action":
-                    event_data['tool_name'] = step.tool_name
-                    event_data['tool_input'] = step.tool_input if hasattr(step, 'tool_input') else None
-                
-                return f"data: {json.dumps(event_data)}\n\n"
-            
-            controller.set_step_callback(step_callback)
-            
             # Run controller and stream steps
             # Note: We need to run this in a thread to avoid blocking
-            import threading
-            from queue import Queue
-            
             message_queue = Queue()
             results = {}
             
             def run_controller():
+                controller_started.set()
                 try:
                     # Override callback to push to queue
                     def queue_callback(step):
@@ -328,69 +496,84 @@ async def generate_leads_stream(
                         
                         message_queue.put(event_data)
                     
-                    controller.set_step_callback(queue_callback)
-                    leads = controller.run()
+                    # Push each lead to the stream as soon as the controller saves it
+                    found_leads = []
                     
-                    # Send each lead as separate event
-                    for lead in leads:
+                    def lead_callback(lead):
+                        found_leads.append(lead)
                         message_queue.put({'event_type': 'lead', 'lead_data': lead})
                     
-                    results['leads'] = leads
-                    message_queue.put({'event_type': 'complete', 'total_leads': len(leads)})
+                    controller.set_step_callback(queue_callback)
+                    controller.set_lead_callback(lead_callback)
+                    controller.run()
+                    
+                    results['leads'] = found_leads
+                    message_queue.put({'event_type': 'complete', 'total_leads': len(found_leads)})
                     
                 except Exception as e:
                     logger.exception("Controller error")
                     message_queue.put({'event_type': 'error', 'message': str(e)})
             
-            # Start controller in background thread
-            thread = threading.Thread(target=run_controller)
-            thread.start()
+            # Run controller in a worker thread, bounded by the shared limiter
+            task = asyncio.create_task(
+                anyio.to_thread.run_sync(run_controller, limiter=app.state.gen_limiter)
+            )
             
             # Stream messages from queue
-            while True:
-                # Check if cancelled
-                if cancellation_flag.get("cancelled"):
-                    yield f"event: error\ndata: {json.dumps({'message': 'Generation cancelled by user'})}\n\n"
-                    break
+            try:
+                while True:
+                    # Check if cancelled
+                    if cancellation_flag.get("cancelled"):
+                        yield ERROR_PREFIX + orjson.dumps({'message': 'Generation cancelled by user'}) + SUFFIX
+                        break
                 
-                try:
-                    # Non-blocking get with timeout
-                    message = message_queue.get(timeout=0.1)
+                    try:
+                        # Non-blocking get (never block the event loop)
+                        message = message_queue.get_nowait()
                     
-                    # Check if it's a lead event
-                    if message.get('event_type') == 'lead':
-                        yield f"event: lead\ndata: {json.dumps(message['lead_data'])}\n\n"
-                        continue
+                        # Check if it's a lead event
+                        if message.get('event_type') == 'lead':
+                            yield LEAD_PREFIX + orjson.dumps(message['lead_data']) + SUFFIX
+                            continue
                     
-                    # Check if it's a complete event
-                    if message.get('event_type') == 'complete':
-                        yield f"event: complete\ndata: {json.dumps({'total_leads': message.get('total_leads', 0)})}\n\n"
-                        break
+                        # Check if it's a complete event
+                        if message.get('event_type') == 'complete':
+                            await _cache_leads(cache_key, results.get('leads', []))
+                            yield COMPLETE_PREFIX + orjson.dumps({'total_leads': message.get('total_leads', 0)}) + SUFFIX
+                            break
                     
-                    # Check if it's an error
-                    if message.get('event_type') == 'error':
-                        yield f"event: error\ndata: {json.dumps({'message': message['message']})}\n\n"
-                        break
+                        # Check if it's an error
+                        if message.get('event_type') == 'error':
+                            yield ERROR_PREFIX + orjson.dumps({'message': message['message']}) + SUFFIX
+                            break
                     
-                    # Otherwise it's a step/observation from controller
-                    if message.get('step') == 'thought':
-                        yield f"event: step\ndata: {json.dumps({'step': 'thinking', 'message': message.get('message', '')})}\n\n"
-                    elif message.get('step') == 'action':
-                        yield f"event: step\ndata: {json.dumps({'step': 'action', 'message': message.get('message', ''), 'tool': message.get('tool_name', '')})}\n\n"
-                    elif message.get('step') == 'observation' or message.get('observation'):
-                        yield f"event: observation\ndata: {json.dumps({'observation': message.get('message', '') or message.get('observation', '')})}\n\n"
+                        # Otherwise it's a step/observation from controller
+                        if message.get('step') == 'thought':
+                            yield STEP_PREFIX + orjson.dumps({'step': 'thinking', 'message': message.get('message', '')}) + SUFFIX
+                        elif message.get('step') == 'action':
+                            yield STEP_PREFIX + orjson.dumps({'step': 'action', 'message': message.get('message', ''), 'tool': message.get('tool_name', '')}) + SUFFIX
+                        elif message.get('step') == 'observation' or message.get('observation'):
+                            yield OBSERVATION_PREFIX + orjson.dumps({'observation': message.get('message', '') or message.get('observation', '')}) + SUFFIX
                 
-                except:
-                    # Queue empty, check if thread still alive
-                    if not thread.is_alive():
-                        break
-                    await asyncio.sleep(0.1)
+                    except Empty:
+                        # Queue empty, check if controller still running
+                        if task.done():
+                            break
+                        await asyncio.sleep(0.1)
             
-            thread.join()
+                await task
+            finally:
+                # Client disconnected (or stream aborted) before the run finished
+                if not task.done():
+                    # Running in a worker thread - stop it via check_cancellation
+                    client_gone.set()
+                    if not controller_started.is_set():
+                        # Still queued on the limiter - drop it before it takes a slot
+                        task.cancel()
             
         except Exception as e:
             logger.exception("Streaming failed")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield DATA_PREFIX + orjson.dumps({'type': 'error', 'message': str(e)}) + SUFFIX
     
     return StreamingResponse(
         event_generator(),
@@ -415,7 +598,7 @@ async def cancel_generation():
     gen_id = active_generation_id
     active_generation_id = None
     
-    logger.info(f"🛑 Generation {gen_id} cancelled by user")
+    logger.info("🛑 Generation %s cancelled by user", gen_id)
     
     return {
         "status": "cancelled",
@@ -436,7 +619,7 @@ async def cancel_generation():
     gen_id = active_generation_id
     active_generation_id = None
     
-    logger.info(f"🛑 Generation {gen_id} cancelled by user")
+    logger.info("🛑 Generation %s cancelled by user", gen_id)
     
     return {
         "status": "cancelled",
@@ -449,10 +632,10 @@ async def get_all_leads():
     """Retrieve all persisted leads from JSON storage"""
     try:
         leads = load_leads()
-        logger.info(f"Retrieved {len(leads)} persisted leads")
+        logger.info("Retrieved %d persisted leads", len(leads))
         return leads
     except Exception as e:
-        logger.error(f"Failed to load leads: {e}")
+        logger.error("Failed to load leads: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/leads")
@@ -463,7 +646,7 @@ async def delete_all_leads():
         logger.warning("All leads cleared")
         return {"status": "cleared", "message": "All leads have been deleted"}
     except Exception as e:
-        logger.error(f"Failed to clear leads: {e}")
+        logger.error("Failed to clear leads: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== MONGODB ENDPOINTS ====================
@@ -479,10 +662,10 @@ async def configure_mongodb(config: MongoDBConfigRequest):
         result = await manager.configure(config.mongo_uri, config.database_name)
         
         if result['status'] == 'success':
-            logger.info(f"✅ MongoDB configured: {config.database_name}")
+            logger.info("✅ MongoDB configured: %s", config.database_name)
             return result
         else:
-            logger.error(f"❌ MongoDB configuration failed: {result['message']}")
+            logger.error("❌ MongoDB configuration failed: %s", result['message'])
             raise HTTPException(status_code=400, detail=result['message'])
     
     except Exception as e:
@@ -515,7 +698,7 @@ async def create_product(product: ProductCreateRequest):
         )
         
         if result['status'] == 'success':
-            logger.info(f"✅ Product created: {product.name}")
+            logger.info("✅ Product created: %s", product.name)
             return result
         else:
             raise HTTPException(status_code=400, detail=result['message'])
@@ -525,29 +708,24 @@ async def create_product(product: ProductCreateRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/products")
-async def list_products():
+async def list_products(products_collection = Depends(get_products_collection)):
     """List all products"""
     try:
-        manager = get_db_manager()
-        if not manager.is_configured():
-            raise HTTPException(status_code=503, detail="MongoDB not configured")
-        
-        db = manager.get_database()
-        products_collection = db.products
-        
         # Get all products, sorted by creation date
-        products = []
-        async for product_doc in products_collection.find().sort('created_at', -1):
-            products.append({
+        product_docs = await products_collection.find().sort('created_at', -1).to_list(length=None)
+        products = [
+            {
                 'id': str(product_doc['_id']),
                 'name': product_doc['name'],
                 'description': product_doc['description'],
                 'lead_count': product_doc.get('lead_count', 0),
                 'created_at': product_doc['created_at'].isoformat() if 'created_at' in product_doc else None,
                 'metadata': product_doc.get('metadata', {})
-            })
+            }
+            for product_doc in product_docs
+        ]
         
-        logger.info(f"Retrieved {len(products)} products")
+        logger.info("Retrieved %d products", len(products))
         return {'products': products, 'count': len(products)}
     
     except Exception as e:
@@ -555,16 +733,14 @@ async def list_products():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/products/{product_id}")
-async def get_product(product_id: str):
+async def get_product(
+    product_id: str,
+    product_oid: ObjectId = Depends(product_object_id),
+    products_collection = Depends(get_products_collection)
+):
     """Get a single product by ID"""
     try:
-        from bson import ObjectId
-        manager = get_db_manager()
-        if not manager.is_configured():
-            raise HTTPException(status_code=503, detail="MongoDB not configured")
-        
-        db = manager.get_database()
-        product_doc = await db.products.find_one({'_id': ObjectId(product_id)})
+        product_doc = await products_collection.find_one({'_id': product_oid})
         
         if not product_doc:
             raise HTTPException(status_code=404, detail="Product not found")
@@ -585,19 +761,17 @@ async def get_product(product_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/products/{product_id}/leads")
-async def get_product_leads(product_id: str, min_score: Optional[int] = 0, limit: Optional[int] = 100):
+async def get_product_leads(
+    product_id: str,
+    min_score: Optional[int] = 0,
+    limit: Optional[int] = 100,
+    product_oid: ObjectId = Depends(product_object_id),
+    leads_collection = Depends(get_leads_collection)
+):
     """Get all leads for a specific product"""
     try:
-        from bson import ObjectId
-        manager = get_db_manager()
-        if not manager.is_configured():
-            raise HTTPException(status_code=503, detail="MongoDB not configured")
-        
-        db = manager.get_database()
-        leads_collection = db.leads
-        
         # Build query
-        query = {'product_id': ObjectId(product_id)}
+        query = {'product_id': product_oid}
         if min_score > 0:
             query['qualification.score'] = {'$gte': min_score}
         
@@ -615,7 +789,7 @@ async def get_product_leads(product_id: str, min_score: Optional[int] = 0, limit
                 'created_at': lead_doc['created_at'].isoformat() if 'created_at' in lead_doc else None
             })
         
-        logger.info(f"Retrieved {len(leads)} leads for product {product_id}")
+        logger.info("Retrieved %d leads for product %s", len(leads), product_id)
         return {'leads': leads, 'count': len(leads)}
     
     except HTTPException:
@@ -626,19 +800,9 @@ async def get_product_leads(product_id: str, min_score: Optional[int] = 0, limit
 
 
 @app.post("/api/mongodb/leads")
-async def create_mongodb_lead(lead_data: dict):
+async def create_mongodb_lead(lead_data: dict, leads_collection = Depends(get_leads_collection)):
     """Create a new lead in MongoDB (called by agent save_lead tool)"""
     try:
-        from bson import ObjectId
-        from datetime import datetime
-        
-        manager = get_db_manager()
-        if not manager.is_configured():
-            raise HTTPException(status_code=503, detail="MongoDB not configured")
-        
-        db = manager.get_database()
-        leads_collection = db.leads
-        
         # Check for duplicate by domain
         existing = await leads_collection.find_one({'domain': lead_data.get('domain')})
         if existing:
@@ -649,6 +813,7 @@ async def create_mongodb_lead(lead_data: dict):
             }
         
         # Create lead document
+        now = datetime.now(timezone.utc)
         lead_doc = {
             'domain': lead_data.get('domain'),
             'name': lead_data.get('name'),
@@ -659,18 +824,19 @@ async def create_mongodb_lead(lead_data: dict):
             'linkedin_url': lead_data.get('linkedin_url'),
             'qualification': lead_data.get('qualification', {}),
             'product_context': lead_data.get('product_context', ''),
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow()
+            'created_at': now,
+            'created_at_iso': created_at_iso(now),
+            'updated_at': now
         }
         
         # Set qualification timestamp
         if 'qualification' in lead_doc and lead_doc['qualification']:
-            lead_doc['qualification']['qualified_at'] = datetime.utcnow().isoformat()
+            lead_doc['qualification']['qualified_at'] = now.isoformat()
         
         # Insert lead
         result = await leads_collection.insert_one(lead_doc)
         
-        logger.info(f"✅ Created lead in MongoDB: {lead_data.get('name')} ({lead_data.get('domain')})")
+        logger.info("✅ Created lead in MongoDB: %s (%s)", lead_data.get('name'), lead_data.get('domain'))
         
         return {
             'status': 'success',
@@ -690,17 +856,11 @@ async def get_all_mongodb_leads(
     min_score: int = 0, 
     limit: int = 100,
     product_id: Optional[str] = None,
-    product_name: Optional[str] = None
+    product_name: Optional[str] = None,
+    leads_collection = Depends(get_leads_collection)
 ):
     """Get all leads from MongoDB with optional filtering by score, product_id, or product_name"""
     try:
-        manager = get_db_manager()
-        if not manager.is_configured():
-            raise HTTPException(status_code=503, detail="MongoDB not configured")
-        
-        db = manager.get_database()
-        leads_collection = db.leads
-        
         # Build query
         query = {}
         if min_score > 0:
@@ -729,7 +889,7 @@ async def get_all_mongodb_leads(
                 'created_at': lead_doc['created_at'].isoformat() if 'created_at' in lead_doc else None
             })
         
-        logger.info(f"Retrieved {len(leads)} leads from MongoDB")
+        logger.info("Retrieved %d leads from MongoDB", len(leads))
         return {'leads': leads, 'count': len(leads)}
     
     except HTTPException:
@@ -740,39 +900,21 @@ async def get_all_mongodb_leads(
 
 
 @app.get("/api/leads/products")
-async def list_products():
+async def list_products(products_collection = Depends(get_products_collection)):
     """Get list of all products for filtering (from products collection, not leads aggregation)"""
     try:
-        manager = get_db_manager()
-        if not manager.is_configured():
-            raise HTTPException(status_code=503, detail="MongoDB not configured")
-        
-        db = manager.get_database()
-        products_collection = db.products
-        leads_collection = db.leads
-        
-        # Get all products
-        products = []
-        async for product_doc in products_collection.find().sort('created_at', -1):
-            product_id = str(product_doc['_id'])
-            product_name = product_doc.get('name', 'Unnamed Product')
-            
-            # Count leads for this specific product only
-            # Match by product_id OR product_name
-            lead_count = await leads_collection.count_documents({
-                '$or': [
-                    {'product_id': product_id},
-                    {'product_name': product_name}
-                ]
-            })
-            
-            products.append({
-                'product_id': product_id,
-                'product_name': product_name,
-                'lead_count': lead_count
-            })
+        # lead_count is a cached field maintained on lead save (and reconciled hourly)
+        product_docs = await products_collection.find({}, {'name': 1, 'lead_count': 1}).sort('created_at', -1).to_list(length=None)
+        products = [
+            {
+                'product_id': str(product_doc['_id']),
+                'product_name': product_doc.get('name', 'Unnamed Product'),
+                'lead_count': product_doc.get('lead_count', 0)
+            }
+            for product_doc in product_docs
+        ]
         
-        logger.info(f"Found {len(products)} products")
+        logger.info("Found %d products", len(products))
         return {'products': products, 'count': len(products)}
     
     except HTTPException:
@@ -782,72 +924,76 @@ async def list_products():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/leads/filter")
+@app.get("/api/leads/filter", response_class=MongoJSONResponse)
 async def filter_leads(
     product_id: Optional[str] = None,
     min_score: Optional[int] = 0,
     persona: Optional[str] = None,
-    limit: Optional[int] = 100
+    # $limit must be positive, and the whole page shares one $facet document (16MB cap)
+    limit: int = Query(100, ge=1, le=FILTER_LEADS_MAX_LIMIT),
+    leads_collection = Depends(get_leads_collection)
 ):
     """Filter leads across all products or specific product"""
     try:
-        from bson import ObjectId
-        manager = get_db_manager()
-        if not manager.is_configured():
-            raise HTTPException(status_code=503, detail="MongoDB not configured")
-        
-        db = manager.get_database()
-        leads_collection = db.leads
-        
         # Build query
         query = {}
         if product_id:
+            if not _OID_RE.match(product_id):
+                raise HTTPException(status_code=400, detail="Invalid product_id")
             query['product_id'] = ObjectId(product_id)
-        if min_score > 0:
+        # A score floor of 1 filters almost nothing - omit it so the planner
+        # can use the more selective (product_id, created_at) index
+        if min_score and min_score > 1:
             query['qualification.score'] = {'$gte': min_score}
         if persona:
             query['emails.persona'] = persona
         
-        # Get leads
-        leads = []
-        async for lead_doc in leads_collection.find(query).sort('created_at', -1).limit(limit):
-            leads.append({
-                'id': str(lead_doc['_id']),
-                'product_id': str(lead_doc['product_id']),
-                'domain': lead_doc.get('domain'),
-                'name': lead_doc.get('name'),
-                'description': lead_doc.get('description'),
-                'url': lead_doc.get('url'),
-                'emails': lead_doc.get('emails', []),
-                'qualification': lead_doc.get('qualification'),
-                'created_at': lead_doc['created_at'].isoformat() if 'created_at' in lead_doc else None
-            })
-        
-        logger.info(f"Filtered {len(leads)} leads (filters: product={product_id}, min_score={min_score}, persona={persona})")
-        return {'leads': leads, 'count': len(leads), 'filters': {'product_id': product_id, 'min_score': min_score, 'persona': persona}}
+        # Get the page of leads and the total match count in one round trip.
+        # Sort before $facet: sub-pipelines can't use indexes, while $match +
+        # $sort here run as one index-backed scan feeding both facets.
+        pipeline = [
+            {'$match': query},
+            {'$sort': {'created_at': -1}},
+            {'$facet': {
+                'results': [
+                    {'$limit': limit},
+                    {'$project': FILTER_LEADS_PROJECTION}
+                ],
+                'total': [{'$count': 'n'}]
+            }}
+        ]
+        aggregate_options = {}
+        if 'product_id' in query and 'qualification.score' in query:
+            aggregate_options['hint'] = [('product_id', 1), ('created_at', -1)]
+        cursor = await leads_collection.aggregate(pipeline, **aggregate_options)
+        facet = (await cursor.to_list(length=1))[0]
+        lead_docs = facet['results']
+        total = facet['total'][0]['n'] if facet['total'] else 0
+        # ObjectIds are left in place - MongoJSONResponse encodes them in orjson's C path
+        leads = [dict(zip(FILTER_LEAD_KEYS, row)) for row in map(FILTER_LEAD_FIELDS, lead_docs)]
+        
+        logger.info("Filtered %d leads (filters: product=%s, min_score=%s, persona=%s)", len(leads), product_id, min_score, persona)
+        # Return the response directly so orjson encodes it without the jsonable_encoder pass
+        return MongoJSONResponse({'leads': leads, 'count': len(leads), 'total': total, 'filters': {'product_id': product_id, 'min_score': min_score, 'persona': persona}})
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Failed to filter leads")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Service configuration is fixed for the process lifetime - compute health once
+_HEALTH = {
+    "status": "healthy",
+    "searxng_configured": bool(os.getenv("SEARXNG_BASE_URL", "")),
+    "firecrawl_configured": bool(os.getenv("FIRECRAWL_BASE_URL", "")),
+    "llm_configured": bool(os.getenv("OPENAI_API_KEY", ""))
+}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    import os
-    
-    # Check required environment variables
-    searxng_url = os.getenv("SEARXNG_BASE_URL", "")
-    firecrawl_url = os.getenv("FIRECRAWL_BASE_URL", "")
-    openai_key = os.getenv("OPENAI_API_KEY", "")
-    
-    status = {
-        "status": "healthy",
-        "searxng_configured": bool(searxng_url),
-        "firecrawl_configured": bool(firecrawl_url),
-        "llm_configured": bool(openai_key)
-    }
-    
-    return status
+    return _HEALTH
 
 if __name__ == "__main__":
     import uvicorn
@@ -4,49 +4,84 @@ Configuration management using environment variables
 """
 
 import os
+import logging
+from functools import lru_cache
 from dotenv import load_dotenv
 from pathlib import Path
+from pydantic import BaseModel
 
-# Load .env file from project root
+logger = logging.getLogger(__name__)
+
+# .env file in project root
 env_path = Path(__file__).parent.parent / ".env"
-load_dotenv(dotenv_path=env_path, override=True)
 
-# ============= REQUIRED SERVICES =============
 
-SEARXNG_BASE_URL = os.getenv("SEARXNG_BASE_URL", "")
-FIRECRAWL_BASE_URL = os.getenv("FIRECRAWL_BASE_URL", "")
+class Settings(BaseModel):
+    """Process-wide configuration resolved from the environment"""
+
+    # ============= REQUIRED SERVICES =============
+    SEARXNG_BASE_URL: str = ""
+    FIRECRAWL_BASE_URL: str = ""
+
+    # ============= LLM CONFIGURATION =============
+    OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    OPENAI_MODEL: str = "gpt-4"
+
+    # ============= AGENT CONFIGURATION =============
+    MAX_SEARCH_ITERATIONS: int = 5
+    TARGET_LEAD_COUNT: int = 30
+    FIRECRAWL_TIMEOUT: int = 30
+
+    # ============= MONGODB CONNECTION POOL =============
+    MONGO_MAX_POOL: int = 20
+    MONGO_MIN_POOL: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 60000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+
+    # ============= API CONFIGURATION =============
+    MAX_CONCURRENT_GENERATIONS: int = 4  # Controller runs in worker threads at once (extra requests wait)
+
+    # ============= LOGGING =============
+    LOG_LEVEL: str = "INFO"
 
-if not SEARXNG_BASE_URL:
-    print("WARNING: SEARXNG_BASE_URL not set. SearxNG search will fail.")
-if not FIRECRAWL_BASE_URL:
-    print("WARNING: FIRECRAWL_BASE_URL not set. Firecrawl enrichment will fail.")
 
-# ============= LLM CONFIGURATION =============
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load .env once and build the settings (cached for the process)"""
+    load_dotenv(dotenv_path=env_path, override=False)
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
+    settings = Settings(**{
+        name: os.environ[name]
+        for name in Settings.model_fields
+        if name in os.environ
+    })
 
-if not OPENAI_API_KEY:
-    print("WARNING: OPENAI_API_KEY not set. LLM calls will fail.")
+    if not settings.SEARXNG_BASE_URL:
+        logger.warning("SEARXNG_BASE_URL not set. SearxNG search will fail.")
+    if not settings.FIRECRAWL_BASE_URL:
+        logger.warning("FIRECRAWL_BASE_URL not set. Firecrawl enrichment will fail.")
+    if not settings.OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY not set. LLM calls will fail.")
 
-# ============= AGENT CONFIGURATION =============
+    return settings
 
-MAX_SEARCH_ITERATIONS = int(os.getenv("MAX_SEARCH_ITERATIONS", "5"))
-TARGET_LEAD_COUNT = int(os.getenv("TARGET_LEAD_COUNT", "30"))
-FIRECRAWL_TIMEOUT = int(os.getenv("FIRECRAWL_TIMEOUT", "30"))
 
-# ============= LOGGING =============
+def __getattr__(name: str):
+    """Keep `from config.settings import FOO` working, resolved lazily"""
+    if name in Settings.model_fields:
+        return getattr(get_settings(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
 def print_config():
     """Print current configuration (for debugging)"""
+    settings = get_settings()
     print("\n===== Lead Generator Configuration =====")
-    print(f"SEARXNG_BASE_URL: {SEARXNG_BASE_URL or '❌ NOT SET'}")
-    print(f"FIRECRAWL_BASE_URL: {FIRECRAWL_BASE_URL or '❌ NOT SET'}")
-    print(f"OPENAI_BASE_URL: {OPENAI_BASE_URL}")
-    print(f"OPENAI_MODEL: {OPENAI_MODEL}")
-    print(f"MAX_SEARCH_ITERATIONS: {MAX_SEARCH_ITERATIONS}")
-    print(f"TARGET_LEAD_COUNT: {TARGET_LEAD_COUNT}")
+    print(f"SEARXNG_BASE_URL: {settings.SEARXNG_BASE_URL or '❌ NOT SET'}")
+    print(f"FIRECRAWL_BASE_URL: {settings.FIRECRAWL_BASE_URL or '❌ NOT SET'}")
+    print(f"OPENAI_BASE_URL: {settings.OPENAI_BASE_URL}")
+    print(f"OPENAI_MODEL: {settings.OPENAI_MODEL}")
+    print(f"MAX_SEARCH_ITERATIONS: {settings.MAX_SEARCH_ITERATIONS}")
+    print(f"TARGET_LEAD_COUNT: {settings.TARGET_LEAD_COUNT}")
     print("========================================\n")
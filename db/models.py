@@ -4,8 +4,8 @@ Defines the structure of Products, Leads, and Config documents
 """
 
 from typing import List, Dict, Any, Optional
-from datetime import datetime
-from pydantic import BaseModel, Field, GetCoreSchemaHandler, GetJsonSchemaHandler
+from datetime import datetime, timezone
+from pydantic import BaseModel, Field, ConfigDict, GetCoreSchemaHandler, GetJsonSchemaHandler
 from pydantic.json_schema import JsonSchemaValue
 from pydantic_core import core_schema
 from bson import ObjectId
@@ -80,10 +80,11 @@ class Lead(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
-    class Config:
-        populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True,
+        json_encoders={ObjectId: str}
+    )
 
 
 class ProductMetadata(BaseModel):
@@ -105,10 +106,11 @@ class Product(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     lead_count: int = 0  # Cached count, updated on lead save
     
-    class Config:
-        populate_by_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True,
+        json_encoders={ObjectId: str}
+    )
 
 
 class MongoDBConfig(BaseModel):
@@ -118,30 +120,37 @@ class MongoDBConfig(BaseModel):
     database_name: str
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 # Helper functions for common operations
 
 def product_to_dict(product: Product) -> Dict[str, Any]:
     """Convert Product model to MongoDB document"""
-    doc = product.dict(by_alias=True, exclude_none=True)
+    doc = product.model_dump(by_alias=True, exclude_none=True, mode='python')
     if 'id' in doc and doc['id'] is None:
         del doc['id']
     return doc
 
 
+def created_at_iso(dt: datetime) -> str:
+    """Canonical created_at_iso: naive UTC at BSON (millisecond) precision"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    dt = dt.replace(microsecond=dt.microsecond // 1000 * 1000)
+    # Always 6 fractional digits, matching the $dateToString fallback in filter_leads
+    return dt.isoformat(timespec='microseconds')
+
+
 def lead_to_dict(lead: Lead) -> Dict[str, Any]:
     """Convert Lead model to MongoDB document"""
-    doc = lead.dict(by_alias=True, exclude_none=True)
+    # Nested EmailDetail / LeadQualification models are dumped recursively
+    doc = lead.model_dump(by_alias=True, exclude_none=True, mode='python')
     if 'id' in doc and doc['id'] is None:
         del doc['id']
-    # Convert EmailDetail and LeadQualification to dicts
-    if 'emails' in doc:
-        doc['emails'] = [email.dict() if isinstance(email, EmailDetail) else email for email in doc['emails']]
-    if 'qualification' in doc and doc['qualification']:
-        doc['qualification'] = doc['qualification'].dict() if isinstance(doc['qualification'], LeadQualification) else doc['qualification']
+    # Precomputed so reads can return it without per-document formatting
+    if 'created_at' in doc:
+        doc['created_at_iso'] = created_at_iso(doc['created_at'])
     return doc
 
 
@@ -167,9 +176,14 @@ LEAD_INDEXES = [
     [("domain", 1), ("product_id", 1)],  # Duplicate checking
     [("qualification.score", -1)],  # Sort by score
     [("created_at", -1)],  # Sort by date
+    [("product_id", 1), ("created_at", -1)],  # Filter by product, newest first
+    [("qualification.score", -1), ("created_at", -1)],  # Filter by score, newest first
 ]
 
 PRODUCT_INDEXES = [
     [("created_at", -1)],  # Sort by date
     [("name", 1)],  # Search by name
 ]
+
+# Cached lead-generation results expire after this many seconds (TTL index on created_at)
+LEAD_GEN_CACHE_TTL_SECONDS = 3600
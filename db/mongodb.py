@@ -3,14 +3,29 @@ MongoDB Connection Manager
 Singleton pattern for managing MongoDB connections with runtime configuration
 """
 
+import asyncio
 import logging
+import time
 from typing import Optional, Dict, Any
 from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 
+from pymongo import IndexModel
+
+from config.settings import get_settings
+
+from .models import LEAD_INDEXES, PRODUCT_INDEXES, LEAD_GEN_CACHE_TTL_SECONDS
+
 logger = logging.getLogger(__name__)
 
+# Background liveness ping: interval, and how stale the last success may get
+# before is_configured() reports the connection as down
+PING_INTERVAL_SECONDS = 10
+PING_FRESHNESS_SECONDS = 30
+
 
 class MongoDBManager:
     """
@@ -18,9 +33,15 @@ class MongoDBManager:
     """
     
     _instance: Optional['MongoDBManager'] = None
-    _client: Optional[AsyncIOMotorClient] = None
-    _db: Optional[AsyncIOMotorDatabase] = None
-    _config: Dict[str, str] = {}
+    _client: Optional[AsyncMongoClient] = None
+    _db: Optional[AsyncDatabase] = None
+    _config: Dict[str, Any] = {}
+    _last_ping_ok: float = 0
+    _ping_task: Optional[asyncio.Task] = None
+    
+    # Collection handles bound once per configure()
+    leads: Optional[AsyncCollection] = None
+    products: Optional[AsyncCollection] = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -31,47 +52,91 @@ class MongoDBManager:
         """Initialize manager (singleton pattern ensures this runs once)"""
         pass
     
-    async def configure(self, mongo_uri: str, database_name: str) -> Dict[str, Any]:
+    async def configure(
+        self,
+        mongo_uri: str,
+        database_name: str,
+        max_pool_size: Optional[int] = None,
+        min_pool_size: Optional[int] = None,
+        max_idle_time_ms: Optional[int] = None,
+        wait_queue_timeout_ms: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Configure MongoDB connection at runtime
         
         Args:
             mongo_uri: MongoDB connection URI
             database_name: Name of the database to use
+            max_pool_size: Max pooled connections (default MONGO_MAX_POOL)
+            min_pool_size: Connections kept open (default MONGO_MIN_POOL)
+            max_idle_time_ms: Idle time before a connection is closed (default MONGO_MAX_IDLE_TIME_MS)
+            wait_queue_timeout_ms: Max wait for a free connection (default MONGO_WAIT_QUEUE_TIMEOUT_MS)
             
         Returns:
             Dict with status and message
         """
+        # Settings are resolved here (not at import) so importing this module stays cheap
+        settings = get_settings()
+        pool_options = {
+            'maxPoolSize': settings.MONGO_MAX_POOL if max_pool_size is None else max_pool_size,
+            'minPoolSize': settings.MONGO_MIN_POOL if min_pool_size is None else min_pool_size,
+            'maxIdleTimeMS': settings.MONGO_MAX_IDLE_TIME_MS if max_idle_time_ms is None else max_idle_time_ms,
+            'waitQueueTimeoutMS': settings.MONGO_WAIT_QUEUE_TIMEOUT_MS if wait_queue_timeout_ms is None else wait_queue_timeout_ms,
+        }
+        
+        # Reuse the live client when nothing changed (avoids a reconnect storm)
+        if (
+            self._client is not None
+            and self._config.get('mongo_uri') == mongo_uri
+            and self._config.get('database_name') == database_name
+            and self._config.get('pool_options') == pool_options
+        ):
+            return {
+                'status': 'success',
+                'message': f'Already connected to MongoDB database: {database_name}',
+                'database': database_name
+            }
+        
         try:
             # Close existing connection if any
+            self._stop_ping_task()
             if self._client:
-                self._client.close()
+                await self._client.close()
                 logger.info("[MongoDB] Closed previous connection")
             
             # Create new client
-            self._client = AsyncIOMotorClient(
+            self._client = AsyncMongoClient(
                 mongo_uri,
                 serverSelectionTimeoutMS=5000,  # 5 second timeout
-                maxPoolSize=50,
-                minPoolSize=10
+                **pool_options
             )
             
             # Test connection
             await self._client.admin.command('ping')
+            self._last_ping_ok = time.monotonic()
             
             # Set database
             self._db = self._client[database_name]
+            self.leads = self._db.leads
+            self.products = self._db.products
             
             # Store config
             self._config = {
                 'mongo_uri': mongo_uri,
                 'database_name': database_name,
+                'pool_options': pool_options,
                 'configured_at': datetime.utcnow().isoformat()
             }
             
             # Save config to database for persistence
             await self._save_config()
             
+            # Make sure required indexes exist
+            await self._ensure_indexes()
+            
+            # Keep the liveness timestamp fresh so requests fail fast during an outage
+            self._ping_task = asyncio.create_task(self._ping_periodically())
+            
             logger.info(f"[MongoDB] Successfully connected to database: {database_name}")
             
             return {
@@ -110,13 +175,110 @@ class MongoDBManager:
             logger.warning(f"[MongoDB] Could not save config: {e}")
 
     
+    async def _ping_periodically(self):
+        """Ping the server in the background and record the last success"""
+        while True:
+            await asyncio.sleep(PING_INTERVAL_SECONDS)
+            try:
+                await self._client.admin.command('ping')
+                self._last_ping_ok = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[MongoDB] Liveness ping failed: {e}")
+    
+    def _stop_ping_task(self):
+        """Cancel the background liveness ping, if running"""
+        if self._ping_task is not None:
+            self._ping_task.cancel()
+            self._ping_task = None
+    
+    async def _ensure_indexes(self):
+        """Create required indexes (idempotent, failures don't abort configure)"""
+        if self._db is None:
+            return
+        
+        collection_indexes = {
+            'leads': [IndexModel(spec) for spec in LEAD_INDEXES],
+            'products': [IndexModel(spec) for spec in PRODUCT_INDEXES],
+            'lead_gen_cache': [
+                IndexModel([('created_at', 1)], expireAfterSeconds=LEAD_GEN_CACHE_TTL_SECONDS)
+            ],
+        }
+        
+        for collection_name, indexes in collection_indexes.items():
+            try:
+                await self._db[collection_name].create_indexes(indexes)
+            except Exception as e:
+                logger.warning(f"[MongoDB] Could not create {collection_name} indexes: {e}")
+    
+    async def backfill_lead_product_ids(self) -> int:
+        """
+        Set product_id on legacy leads that are linked to their product
+        only by product_name (product_id missing or 'default')
+        
+        Returns:
+            Number of leads updated
+        """
+        if self._db is None:
+            return 0
+        
+        updated = 0
+        try:
+            async for product_doc in self._db.products.find({}, {'name': 1}):
+                if not product_doc.get('name'):
+                    continue
+                result = await self._db.leads.update_many(
+                    {
+                        'product_id': {'$in': [None, 'default']},
+                        'product_name': product_doc['name']
+                    },
+                    {'$set': {'product_id': str(product_doc['_id'])}}
+                )
+                updated += result.modified_count
+        except Exception as e:
+            logger.warning(f"[MongoDB] product_id backfill failed: {e}")
+        
+        if updated:
+            logger.info(f"[MongoDB] Backfilled product_id on {updated} legacy leads")
+        return updated
+    
+    async def reconcile_lead_counts(self):
+        """Recompute the cached products.lead_count from the leads collection"""
+        if self._db is None:
+            return
+        
+        try:
+            # Leads reference products by the string form of the product _id
+            cursor = await self._db.products.aggregate([
+                {'$addFields': {'pid': {'$toString': '$_id'}}},
+                {'$lookup': {
+                    'from': 'leads',
+                    'localField': 'pid',
+                    'foreignField': 'product_id',
+                    'pipeline': [{'$project': {'_id': 1}}],
+                    'as': 'lead_docs'
+                }},
+                {'$project': {'lead_count': {'$size': '$lead_docs'}}},
+                {'$merge': {
+                    'into': 'products',
+                    'on': '_id',
+                    'whenMatched': 'merge',
+                    'whenNotMatched': 'discard'
+                }}
+            ])
+            await cursor.to_list(length=None)
+            logger.info("[MongoDB] Reconciled product lead counts")
+        except Exception as e:
+            logger.warning(f"[MongoDB] Lead count reconcile failed: {e}")
+    
     async def load_config_from_env(self, mongo_uri: str, database_name: str):
         """Load configuration from environment variables on startup"""
         if mongo_uri and database_name:
             logger.info("[MongoDB] Loading config from environment")
             await self.configure(mongo_uri, database_name)
     
-    def get_database(self) -> Optional[AsyncIOMotorDatabase]:
+    def get_database(self) -> Optional[AsyncDatabase]:
         """Get the current database instance"""
         return self._db
     
@@ -151,6 +313,7 @@ class MongoDBManager:
         try:
             # Ping server
             await self._client.admin.command('ping')
+            self._last_ping_ok = time.monotonic()
             
             # Get server info
             server_info = await self._client.server_info()
@@ -170,15 +333,22 @@ class MongoDBManager:
             }
     
     def is_configured(self) -> bool:
-        """Check if MongoDB is configured and connected"""
-        return self._client is not None and self._db is not None
+        """Check if MongoDB is configured and answered a ping recently"""
+        return (
+            self._client is not None
+            and self._db is not None
+            and (time.monotonic() - self._last_ping_ok) < PING_FRESHNESS_SECONDS
+        )
     
     async def close(self):
         """Close MongoDB connection"""
+        self._stop_ping_task()
         if self._client:
-            self._client.close()
+            await self._client.close()
             self._client = None
             self._db = None
+            self.leads = None
+            self.products = None
             logger.info("[MongoDB] Connection closed")
 
 
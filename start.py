@@ -11,11 +11,7 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
-
-# Check required configuration
+# Check required configuration (loads .env once via get_settings)
 from config.settings import print_config
 print_config()
 
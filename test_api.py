@@ -10,6 +10,9 @@ from typing import Dict, Any
 # Base URL
 BASE_URL = "http://localhost:8000"
 
+# Shared session - reuses the keep-alive connection across test calls
+SESSION = requests.Session()
+
 def print_response(name: str, response: requests.Response):
     """Pretty print API response"""
     print(f"\n{'='*60}")
@@ -26,7 +29,7 @@ def print_response(name: str, response: requests.Response):
 
 def test_mongodb_health():
     """Test MongoDB health check"""
-    response = requests.get(f"{BASE_URL}/api/config/mongodb/health")
+    response = SESSION.get(f"{BASE_URL}/api/config/mongodb/health")
     print_response("MongoDB Health Check", response)
     return response.status_code == 200
 
@@ -40,7 +43,7 @@ def test_create_product():
         "regions": ["North America", "Europe"]
     }
     
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/api/products",
         json=product_data
     )
@@ -53,37 +56,37 @@ def test_create_product():
 
 def test_list_products():
     """Test listing all products"""
-    response = requests.get(f"{BASE_URL}/api/products")
+    response = SESSION.get(f"{BASE_URL}/api/products")
     print_response("List All Products", response)
     return response.json() if response.status_code == 200 else None
 
 def test_get_product(product_id: str):
     """Test getting a single product"""
-    response = requests.get(f"{BASE_URL}/api/products/{product_id}")
+    response = SESSION.get(f"{BASE_URL}/api/products/{product_id}")
     print_response(f"Get Product {product_id}", response)
     return response.status_code == 200
 
 def test_get_product_leads(product_id: str):
     """Test getting leads for a product"""
-    response = requests.get(f"{BASE_URL}/api/products/{product_id}/leads")
+    response = SESSION.get(f"{BASE_URL}/api/products/{product_id}/leads")
     print_response(f"Get Leads for Product {product_id}", response)
     return response.status_code == 200
 
 def test_filter_leads():
     """Test filtering leads"""
     # Test with no filters
-    response = requests.get(f"{BASE_URL}/api/leads/filter")
+    response = SESSION.get(f"{BASE_URL}/api/leads/filter")
     print_response("Filter Leads (No Filters)", response)
     
     # Test with min_score filter
-    response = requests.get(f"{BASE_URL}/api/leads/filter?min_score=80")
+    response = SESSION.get(f"{BASE_URL}/api/leads/filter?min_score=80")
     print_response("Filter Leads (min_score=80)", response)
     
     return response.status_code == 200
 
 def test_general_health():
     """Test general health endpoint"""
-    response = requests.get(f"{BASE_URL}/health")
+    response = SESSION.get(f"{BASE_URL}/health")
     print_response("General Health Check", response)
     return response.status_code == 200
 
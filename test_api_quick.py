@@ -8,6 +8,9 @@ import json
 
 BASE_URL = "http://localhost:8000"
 
+# Shared session - reuses the keep-alive connection across test calls
+SESSION = requests.Session()
+
 print("\n" + "="*60)
 print("🧪 MongoDB API Quick Test")
 print("="*60)
@@ -19,13 +22,13 @@ config_data = {
     "database_name": "leadgen"
 }
 
-response = requests.post(f"{BASE_URL}/api/config/mongodb", json=config_data)
+response = SESSION.post(f"{BASE_URL}/api/config/mongodb", json=config_data)
 print(f"Status: {response.status_code}")
 print(f"Response: {json.dumps(response.json(), indent=2)}")
 
 # Step 2: Check MongoDB health
 print("\n2. Checking MongoDB health...")
-response = requests.get(f"{BASE_URL}/api/config/mongodb/health")
+response = SESSION.get(f"{BASE_URL}/api/config/mongodb/health")
 print(f"Status: {response.status_code}")
 print(f"Response: {json.dumps(response.json(), indent=2)}")
 
@@ -39,7 +42,7 @@ product_data = {
     "regions": ["North America", "Europe", "Asia"]
 }
 
-response = requests.post(f"{BASE_URL}/api/products", json=product_data)
+response = SESSION.post(f"{BASE_URL}/api/products", json=product_data)
 print(f"Status: {response.status_code}")
 result = response.json()
 print(f"Response: {json.dumps(result, indent=2)}")
@@ -50,13 +53,13 @@ if result.get('status') == 'success':
     
     # Step 4: Get product details
     print("\n4. Getting product details...")
-    response = requests.get(f"{BASE_URL}/api/products/{product_id}")
+    response = SESSION.get(f"{BASE_URL}/api/products/{product_id}")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     
     # Step 5: List all products
     print("\n5. Listing all products...")
-    response = requests.get(f"{BASE_URL}/api/products")
+    response = SESSION.get(f"{BASE_URL}/api/products")
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"Found {data.get('count', 0)} products")
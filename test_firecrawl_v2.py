@@ -2,14 +2,13 @@
 Test Firecrawl v2 API format
 """
 
-import requests
+import asyncio
+import httpx
 import json
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from _env import ENV
 
-FIRECRAWL_BASE_URL = os.getenv("FIRECRAWL_BASE_URL", "")
+FIRECRAWL_BASE_URL = ENV["FIRECRAWL_BASE_URL"]
 
 print("Testing Firecrawl V2 API Format")
 print("=" * 60)
@@ -32,29 +31,45 @@ formats_to_try = [
     {
         "name": "V2 Format 3: Just domain",
         "endpoint": "/v2/scrape",
-        "body": {test_url}  # Just the URL string
+        "body": test_url  # Just the URL string
     }
 ]
 
-for test in formats_to_try:
-    print(f"\n{test['name']}")
-    print("-" * 60)
+async def try_format(client, test):
+    """POST one format, returning (test, response, error)"""
     try:
-        response = requests.post(
-            f"{FIRECRAWL_BASE_URL}{test['endpoint']}",
-            json=test['body'],
-            timeout=30
-        )
-        print(f"Status: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Success! Keys: {list(data.keys())}")
-            print(f"Data preview: {str(data)[:200]}...")
-            break
-        else:
-            print(f"Response: {response.text[:300]}")
+        response = await client.post(f"{FIRECRAWL_BASE_URL}{test['endpoint']}", json=test['body'])
+        return test, response, None
     except Exception as e:
-        print(f"Error: {e}")
+        return test, None, e
+
+async def race_formats(tests):
+    """Try all formats at once and stop at the first 200 (cancelling the rest)"""
+    async with httpx.AsyncClient(http2=True, timeout=30) as client:
+        pending = {asyncio.create_task(try_format(client, test)) for test in tests}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    test, response, error = task.result()
+                    print(f"\n{test['name']}")
+                    print("-" * 60)
+                    if error is not None:
+                        print(f"Error: {error}")
+                        continue
+                    print(f"Status: {response.status_code}")
+                    if response.status_code == 200:
+                        data = response.json()
+                        print(f"✅ Success! Keys: {list(data.keys())}")
+                        print(f"Data preview: {str(data)[:200]}...")
+                        return test
+                    print(f"Response: {response.text[:300]}")
+        finally:
+            for task in pending:
+                task.cancel()
+    return None
+
+asyncio.run(race_formats(formats_to_try))
 
 # Check documentation endpoint
 print("\n" + "=" * 60)
@@ -62,12 +77,15 @@ print("Checking for API docs")
 print("=" * 60)
 
 doc_endpoints = ["/docs", "/api-docs", "/swagger", "/"]
-for endpoint in doc_endpoints:
-    try:
-        response = requests.get(f"{FIRECRAWL_BASE_URL}{endpoint}", timeout=5)
-        if response.status_code == 200 and len(response.text) > 100:
-            print(f"✅ Found docs at: {endpoint}")
-            print(f"Content preview: {response.text[:500]}...")
-            break
-    except:
-        pass
+with httpx.Client(http2=True, timeout=5) as client:
+    for endpoint in doc_endpoints:
+        try:
+            # Stream so only the first 512 bytes of (possibly large) docs pages are read
+            with client.stream("GET", f"{FIRECRAWL_BASE_URL}{endpoint}") as response:
+                chunk = next(response.iter_bytes(chunk_size=512), b"")
+                if response.status_code == 200 and len(chunk) > 100:
+                    print(f"✅ Found docs at: {endpoint}")
+                    print(f"Content preview: {chunk[:500].decode(errors='replace')}...")
+                    break
+        except Exception:
+            pass
@@ -0,0 +1,24 @@
+"""
+Shared pytest configuration for the test suite
+"""
+
+import asyncio
+import pytest
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """uvloop when available (not on Windows), otherwise the stdlib policy"""
+    try:
+        import uvloop
+        return uvloop.EventLoopPolicy()
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
+def event_loop(event_loop_policy):
+    """One event loop for the whole session so the shared client stays usable"""
+    loop = event_loop_policy.new_event_loop()
+    yield loop
+    loop.close()
@@ -0,0 +1,57 @@
+"""
+Firecrawl endpoint smoke tests for the endpoints the app depends on
+Opt-in (live network calls): RUN_FIRECRAWL_TESTS=1 pytest tests/test_firecrawl_endpoints.py -v -n auto
+Optional/legacy endpoints are only probed informationally by test_firecrawl*.py
+"""
+
+import os
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from _env import ENV
+
+FIRECRAWL_BASE_URL = ENV["FIRECRAWL_BASE_URL"]
+
+pytestmark = pytest.mark.skipif(
+    os.environ.get("RUN_FIRECRAWL_TESTS") != "1",
+    reason="live Firecrawl tests are opt-in (set RUN_FIRECRAWL_TESTS=1)"
+)
+
+TEST_URL = "https://example.com"
+
+SCHEMA = {
+    "company_name": "string - company name",
+    "description": "string - company description"
+}
+
+# Statuses meaning the endpoint exists and handled the request
+# (402: instance needs credits/API key, which is a deployment issue, not a missing endpoint)
+OK = frozenset({200})
+HANDLED = frozenset({200, 402})
+
+PROBES = [
+    ("GET", "/health", None, OK),
+    ("POST", "/v2/scrape", {"url": TEST_URL}, OK),
+    ("POST", "/v1/extract", {"url": TEST_URL, "schema": SCHEMA, "timeout": 15000}, HANDLED),
+]
+
+
+@pytest_asyncio.fixture(scope="session")
+async def async_client():
+    """One pooled HTTP/2 client shared by every probe"""
+    if not FIRECRAWL_BASE_URL:
+        pytest.skip("FIRECRAWL_BASE_URL not set in .env")
+
+    async with httpx.AsyncClient(base_url=FIRECRAWL_BASE_URL, http2=True, timeout=35) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method,endpoint,body,expected", PROBES)
+async def test_probe(async_client, method, endpoint, body, expected):
+    """Firecrawl answers the probe with an expected status"""
+    response = await async_client.request(method, endpoint, json=body)
+
+    assert response.status_code in expected, f"{method} {endpoint}: {response.text[:300]}"
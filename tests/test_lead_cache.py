@@ -0,0 +1,36 @@
+"""
+Tests for the lead-generation cache key
+Run with: pytest tests/test_lead_cache.py -v
+"""
+
+import os
+
+# api.main builds the controller LLM client at import time
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from api.main import _lead_cache_key
+
+
+def test_cache_key_ignores_case_and_whitespace():
+    """Description differences in case/whitespace map to the same key"""
+    assert _lead_cache_key("AI  Voicebot\nPlatform", 30, 5) == _lead_cache_key("ai voicebot platform", 30, 5)
+
+
+def test_cache_key_differs_by_product():
+    """Same description for two products never shares cached leads"""
+    key_a = _lead_cache_key("AI Voicebot", 30, 5, product_id="a" * 24, product_name="Voicebot")
+    key_b = _lead_cache_key("AI Voicebot", 30, 5, product_id="b" * 24, product_name="Voicebot")
+    assert key_a != key_b
+    assert key_a != _lead_cache_key("AI Voicebot", 30, 5)
+
+
+def test_cache_key_differs_by_max_iterations():
+    """A deeper search is not served from a shallower run's cache"""
+    assert _lead_cache_key("AI Voicebot", 30, 5) != _lead_cache_key("AI Voicebot", 30, 10)
+
+
+def test_cache_key_parts_do_not_run_together():
+    """Adjacent parts are delimited, so shifting characters between them changes the key"""
+    assert _lead_cache_key("voicebot 1", 5, 5) != _lead_cache_key("voicebot", 15, 5)
+    assert _lead_cache_key("x", 30, 5, product_id="ab", product_name="") != \
+        _lead_cache_key("x", 30, 5, product_id="a", product_name="b")
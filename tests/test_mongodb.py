@@ -4,39 +4,78 @@ Run with: pytest tests/test_mongodb.py -v
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
-from datetime import datetime
+from functools import lru_cache
+from datetime import datetime, timezone, timedelta
 from bson import ObjectId
+from pymongo import InsertOne
+from pymongo.errors import DuplicateKeyError
 
 from db.mongodb import MongoDBManager, get_db_manager
 from db.models import (
     Product, Lead, EmailDetail, LeadQualification,
-    ProductMetadata, product_to_dict, lead_to_dict
+    ProductMetadata, product_to_dict, lead_to_dict, created_at_iso
 )
 
+# Connection pool for the shared test client
+TEST_MIN_POOL = 5
+TEST_MAX_POOL = 20
 
-@pytest.fixture
-async def db_manager():
-    """Setup MongoDB manager for testing"""
+
+@lru_cache(maxsize=32)
+def _product_dict(name: str, description: str) -> dict:
+    """Serialized Product for a name/description pair (built once)"""
+    return product_to_dict(Product(name=name, description=description))
+
+
+def make_test_product_dict(name: str, description: str) -> dict:
+    """Fresh copy of the cached product dict (insert_one adds _id to it)"""
+    return dict(_product_dict(name, description))
+
+
+@pytest_asyncio.fixture(scope="session")
+async def mongo_session():
+    """Configure the MongoDB manager once for the whole test session"""
     manager = get_db_manager()
     
     # Configure with test database
     result = await manager.configure(
         mongo_uri="mongodb://localhost:27017",
-        database_name="leadgen_test"
+        database_name="leadgen_test",
+        min_pool_size=TEST_MIN_POOL,
+        max_pool_size=TEST_MAX_POOL
     )
     
     assert result['status'] == 'success', f"Failed to configure MongoDB: {result.get('message')}"
     
+    # Pre-warm: concurrent pings open the minimum pool before the first test runs
+    db = manager.get_database()
+    await asyncio.gather(*(db.command("ping") for _ in range(TEST_MIN_POOL)))
+    
+    # Indexes backing the duplicate-detection and score-filter queries
+    await db.leads.create_index([("product_id", 1), ("domain", 1)], unique=True)
+    await db.leads.create_index([("product_id", 1), ("qualification.score", -1)])
+    
     yield manager
     
     # Cleanup: Drop test database
-    if manager.get_database():
+    if manager.get_database() is not None:
         await manager.get_database().client.drop_database("leadgen_test")
     
     await manager.close()
 
 
+@pytest_asyncio.fixture
+async def db_manager(mongo_session):
+    """Shared MongoDB manager with leads/products emptied before each test"""
+    db = mongo_session.get_database()
+    await db.leads.delete_many({})
+    await db.products.delete_many({})
+    
+    yield mongo_session
+
+
 @pytest.mark.asyncio
 async def test_mongodb_configuration(db_manager):
     """Test MongoDB configuration"""
@@ -68,14 +107,11 @@ async def test_product_creation(db_manager):
     product_dict = product_to_dict(product)
     result = await products_collection.insert_one(product_dict)
     
-    assert result.inserted_id is not None
-    product_id = result.inserted_id
-    
-    # Retrieve and verify
-    saved_product = await products_collection.find_one({"_id": product_id})
-    assert saved_product is not None
-    assert saved_product['name'] == "AI Voicebot"
-    assert "C-Level" in saved_product['metadata']['target_personas']
+    # Acknowledged write - verify against the document we sent (no read-back)
+    assert result.acknowledged and result.inserted_id is not None
+    assert product_dict['_id'] == result.inserted_id
+    assert product_dict['name'] == "AI Voicebot"
+    assert "C-Level" in product_dict['metadata']['target_personas']
 
 
 @pytest.mark.asyncio
@@ -86,11 +122,9 @@ async def test_lead_creation_with_qualification(db_manager):
     products_collection = db.products
     
     # First create a product
-    product = Product(
-        name="Test Product",
-        description="Test product for leads"
+    product_result = await products_collection.insert_one(
+        make_test_product_dict("Test Product", "Test product for leads")
     )
-    product_result = await products_collection.insert_one(product_to_dict(product))
     product_id = product_result.inserted_id
     
     # Create lead with emails and qualification
@@ -129,7 +163,7 @@ async def test_lead_creation_with_qualification(db_manager):
     assert result.inserted_id is not None
     lead_id = result.inserted_id
     
-    # Retrieve and verify
+    # Retrieve and verify (the one test that checks the BSON round trip)
     saved_lead = await leads_collection.find_one({"_id": lead_id})
     assert saved_lead is not None
     assert saved_lead['domain'] == "acme.com"
@@ -149,7 +183,7 @@ async def test_duplicate_detection(db_manager):
     
     # Create product
     product_result = await products_collection.insert_one(
-        product_to_dict(Product(name="Test", description="Test"))
+        make_test_product_dict("Test", "Test")
     )
     product_id = product_result.inserted_id
     
@@ -176,6 +210,10 @@ async def test_duplicate_detection(db_manager):
     # Verify we can detect it
     is_duplicate = existing is not None
     assert is_duplicate == True
+    
+    # Unique (product_id, domain) index rejects the second insert
+    with pytest.raises(DuplicateKeyError):
+        await leads_collection.insert_one(lead_to_dict(lead1))
 
 
 @pytest.mark.asyncio
@@ -187,50 +225,46 @@ async def test_get_leads_by_product(db_manager):
     
     # Create two products
     product1_result = await products_collection.insert_one(
-        product_to_dict(Product(name="Product 1", description="First"))
+        make_test_product_dict("Product 1", "First")
     )
     product2_result = await products_collection.insert_one(
-        product_to_dict(Product(name="Product 2", description="Second"))
+        make_test_product_dict("Product 2", "Second")
     )
     
     product1_id = product1_result.inserted_id
     product2_id = product2_result.inserted_id
     
-    # Create leads for product 1
-    for i in range(3):
-        lead = Lead(
+    # Create leads for both products in a single batch
+    docs = [
+        lead_to_dict(Lead(
             product_id=product1_id,
             domain=f"company{i}.com",
             name=f"Company {i}",
             description="Test",
             url=f"https://company{i}.com",
             email_source="scraped"
-        )
-        await leads_collection.insert_one(lead_to_dict(lead))
-    
-    # Create leads for product 2
-    for i in range(2):
-        lead = Lead(
+        ))
+        for i in range(3)
+    ] + [
+        lead_to_dict(Lead(
             product_id=product2_id,
             domain=f"other{i}.com",
             name=f"Other {i}",
             description="Test",
             url=f"https://other{i}.com",
             email_source="scraped"
-        )
-        await leads_collection.insert_one(lead_to_dict(lead))
+        ))
+        for i in range(2)
+    ]
+    await leads_collection.bulk_write([InsertOne(doc) for doc in docs], ordered=False)
     
     # Query leads for product 1
-    product1_leads = []
-    async for lead in leads_collection.find({'product_id': product1_id}):
-        product1_leads.append(lead)
+    product1_leads = await leads_collection.find({'product_id': product1_id}).to_list(length=None)
     
     assert len(product1_leads) == 3
     
     # Query leads for product 2
-    product2_leads = []
-    async for lead in leads_collection.find({'product_id': product2_id}):
-        product2_leads.append(lead)
+    product2_leads = await leads_collection.find({'product_id': product2_id}).to_list(length=None)
     
     assert len(product2_leads) == 2
 
@@ -244,14 +278,14 @@ async def test_filter_leads_by_score(db_manager):
     
     # Create product
     product_result = await products_collection.insert_one(
-        product_to_dict(Product(name="Test", description="Test"))
+        make_test_product_dict("Test", "Test")
     )
     product_id = product_result.inserted_id
     
     # Create leads with different scores
     scores = [95, 75, 85, 55, 65]
-    for i, score in enumerate(scores):
-        lead = Lead(
+    docs = [
+        lead_to_dict(Lead(
             product_id=product_id,
             domain=f"company{i}.com",
             name=f"Company {i}",
@@ -263,21 +297,36 @@ async def test_filter_leads_by_score(db_manager):
                 fit="high" if score >= 80 else "medium" if score >= 60 else "low"
             ),
             email_source="scraped"
-        )
-        await leads_collection.insert_one(lead_to_dict(lead))
+        ))
+        for i, score in enumerate(scores)
+    ]
+    await leads_collection.bulk_write([InsertOne(doc) for doc in docs], ordered=False)
     
     # Filter leads with score >= 80
-    high_score_leads = []
-    async for lead in leads_collection.find({
+    high_score_leads = await leads_collection.find({
         'product_id': product_id,
         'qualification.score': {'$gte': 80}
-    }).sort('qualification.score', -1):
-        high_score_leads.append(lead)
+    }).sort('qualification.score', -1).to_list(length=None)
     
     assert len(high_score_leads) == 3  # 95, 85, (75 excluded, 55, 65 excluded)
     assert high_score_leads[0]['qualification']['score'] == 95
     assert high_score_leads[1]['qualification']['score'] == 85
 
 
+
+def test_created_at_iso_canonical_format():
+    """Aware and naive datetimes give the same millisecond string as the $dateToString fallback"""
+    naive = datetime(2026, 1, 2, 3, 4, 5, 678901)
+    aware = datetime(2026, 1, 2, 8, 34, 5, 678901, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    
+    # filter_leads fallback: '%Y-%m-%dT%H:%M:%S.%L000' on the stored BSON date
+    fallback = naive.strftime('%Y-%m-%dT%H:%M:%S.') + f"{naive.microsecond // 1000:03d}000"
+    
+    assert created_at_iso(naive) == fallback == "2026-01-02T03:04:05.678000"
+    assert created_at_iso(aware) == fallback
+    # Whole seconds still carry 6 fractional digits
+    assert created_at_iso(datetime(2026, 1, 2, 3, 4, 5)) == "2026-01-02T03:04:05.000000"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])